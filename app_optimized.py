@@ -655,14 +655,15 @@ def load_polygon_data():
         logger.error(f"Error loading coverage targets: {e}")
         df_coverage_targets = pd.DataFrame()
 
-def create_app() -> Flask:
+def create_app(db_pool_size: int = 8) -> Flask:
     """Create and configure the Flask application"""
     global db_manager, scheduler, cache_manager
     
     logger.info("Initializing optimized Tapsi Food Map Dashboard...")
     
     # Initialize database
-    db_manager = DatabaseManager(config.DATABASE_PATH)
+    # Size the read pool to the server's request threads so none waits on a connection
+    db_manager = DatabaseManager(config.DATABASE_PATH, pool_size=db_pool_size)
     logger.info("Database initialized")
     
     # Load polygon data
@@ -390,7 +390,7 @@ class CoverageGridCacheManager:
         # Database cache stats
         db_stats = {}
         try:
-            with self.db_manager.get_connection() as conn:
+            with self.db_manager.get_read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM coverage_grid_cache")
                 db_stats['database_cache_size'] = cursor.fetchone()[0]
@@ -417,10 +417,8 @@ class CoverageGridCacheManager:
         
         if cache_type in ("all", "database"):
             try:
-                with self.db_manager.get_connection() as conn:
-                    conn.execute("DELETE FROM coverage_grid_cache")
-                    conn.commit()
-                    logger.info("Cleared database cache")
+                self.db_manager.clear_cache_table("coverage_grid_cache")
+                logger.info("Cleared database cache")
             except Exception as e:
                 logger.error(f"Error clearing database cache: {e}")
     
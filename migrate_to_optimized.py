@@ -15,10 +15,14 @@ Run this script once before switching to the optimized version.
 
 import os
 import sys
+import re
+import mmap
 import logging
 import shutil
+import tempfile
 import json
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -29,110 +33,208 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def check_original_files() -> Dict[str, bool]:
-    """Check which original files are present"""
-    original_files = {
-        'app.py': Path('app.py').exists(),
-        'script.js': Path('script.js').exists() or Path('public/script.js').exists(),
-        'index.html': Path('index.html').exists() or Path('public/index.html').exists(),
-        'styles.css': Path('styles.css').exists() or Path('public/styles.css').exists(),
-        'mini.py': Path('mini.py').exists(),
-        'run_production.py': Path('run_production.py').exists(),
-        'requirements.txt': Path('requirements.txt').exists(),
+def _list_dir(path: str) -> Dict[str, bool]:
+    """List a directory once as {entry name: is_dir}; empty if it can't be read"""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry.is_dir() for entry in entries}
+    except OSError:
+        return {}
+
+# Where each original file may live, in lookup order
+ORIGINAL_FILE_LOCATIONS = {
+    'app.py': ('.',),
+    'script.js': ('.', 'public'),
+    'index.html': ('.', 'public'),
+    'styles.css': ('.', 'public'),
+    'mini.py': ('.',),
+    'run_production.py': ('.',),
+    'requirements.txt': ('.',),
+}
+
+DATA_DIR_LOCATIONS = {
+    'src_vendor': 'src/vendor',
+    'src_polygons': 'src/polygons',
+    'src_targets': 'src/targets',
+}
+
+def check_original_files() -> Dict[str, Optional[Path]]:
+    """Check which original files are present, mapping each to its resolved path or None"""
+    root = _list_dir('.')
+    # Every check below is answered from these listings, with no per-file stat
+    listings = {
+        '.': root,
+        'public': _list_dir('public') if root.get('public') else {},
+        'src': _list_dir('src') if root.get('src') else {},
     }
     
-    data_dirs = {
-        'src_vendor': Path('src/vendor').exists(),
-        'src_polygons': Path('src/polygons').exists(),
-        'src_targets': Path('src/targets').exists(),
-    }
+    original_files = {}
+    for file_name, locations in ORIGINAL_FILE_LOCATIONS.items():
+        original_files[file_name] = next(
+            (Path(location) / file_name for location in locations if file_name in listings[location]),
+            None
+        )
+    
+    data_dirs = {}
+    for key, dir_path in DATA_DIR_LOCATIONS.items():
+        parent, _, name = dir_path.partition('/')
+        data_dirs[key] = Path(dir_path) if listings[parent].get(name) else None
     
     return {**original_files, **data_dirs}
 
-def backup_original_files():
-    """Create a backup of original files"""
+COPY_BUFSIZE = 1024 * 1024  # 1 MiB chunks for the userspace copy fallback
+BACKUP_WORKERS = 4
+
+def _fast_copy(src, dst):
+    """Copy a file with a single stat, using sendfile where available"""
+    fin = os.open(src, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        st = os.fstat(fin)
+        fout = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0),
+                       st.st_mode & 0o777)
+        try:
+            copied = False
+            if hasattr(os, 'sendfile'):
+                try:
+                    offset = 0
+                    while offset < st.st_size:
+                        sent = os.sendfile(fout, fin, offset, st.st_size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    copied = True
+                except OSError:
+                    # Filesystem doesn't support sendfile, rewind and copy in userspace
+                    os.lseek(fin, 0, os.SEEK_SET)
+                    os.lseek(fout, 0, os.SEEK_SET)
+                    os.ftruncate(fout, 0)
+
+            if not copied:
+                while True:
+                    chunk = memoryview(os.read(fin, COPY_BUFSIZE))
+                    if not chunk:
+                        break
+                    while chunk:
+                        chunk = chunk[os.write(fout, chunk):]
+        finally:
+            os.close(fout)
+    finally:
+        os.close(fin)
+
+    # Reuse the cached stat result to preserve timestamps
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def backup_original_files(original_files: Dict[str, Optional[Path]]):
+    """Create a backup of original files found by check_original_files()"""
     backup_dir = Path('backup_original')
     backup_dir.mkdir(exist_ok=True)
     
-    logger.info(f"Creating backup in {backup_dir}...")
+    logger.info("Creating backup in %s...", backup_dir)
     
-    files_to_backup = [
-        'app.py', 'script.js', 'index.html', 'styles.css', 
-        'mini.py', 'run_production.py', 'requirements.txt'
-    ]
+    files_to_backup = list(ORIGINAL_FILE_LOCATIONS)
     
-    backed_up = []
-    for file_name in files_to_backup:
-        source = Path(file_name)
-        if source.exists():
-            destination = backup_dir / file_name
-            shutil.copy2(source, destination)
-            backed_up.append(file_name)
-            logger.info(f"Backed up: {file_name}")
+    # The copies are independent and I/O-bound, so overlap them on a small pool
+    copied = set()
+    with ThreadPoolExecutor(max_workers=BACKUP_WORKERS) as executor:
+        futures = {}
+        for file_name in files_to_backup:
+            source = original_files.get(file_name)
+            # Files living under public/ are covered by the directory backup below
+            if source is None or source.parent != Path('.'):
+                continue
+            futures[executor.submit(_fast_copy, source, backup_dir / file_name)] = file_name
+        
+        for future in as_completed(futures):
+            file_name = futures[future]
+            try:
+                future.result()
+            except FileNotFoundError:
+                logger.warning("File disappeared before backup: %s", file_name)
+                continue
+            copied.add(file_name)
+            logger.info("Backed up: %s", file_name)
+    
+    backed_up = [file_name for file_name in files_to_backup if file_name in copied]
     
     # Backup public directory if it exists
     public_dir = Path('public')
     if public_dir.exists():
         backup_public = backup_dir / 'public'
-        if backup_public.exists():
-            shutil.rmtree(backup_public)
-        shutil.copytree(public_dir, backup_public)
+        # Copy into a fresh directory and swap it in, so the backup stays an exact
+        # snapshot (files deleted from public/ don't linger) and a failed copy
+        # leaves the previous backup intact
+        staging = Path(tempfile.mkdtemp(prefix='.public-', dir=backup_dir))
+        try:
+            shutil.copytree(public_dir, staging / 'public', copy_function=shutil.copy2)
+            if backup_public.exists():
+                backup_public.rename(staging / 'previous')
+            (staging / 'public').rename(backup_public)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
         backed_up.append('public/')
         logger.info("Backed up: public/ directory")
     
     return backed_up
 
+# Module-level assignments only; quoted values may contain '#', unquoted ones end at a comment
+CONFIG_ASSIGNMENT_PATTERN = re.compile(
+    rb'^(METABASE_URL|METABASE_USERNAME|METABASE_PASSWORD|ORDER_DATA_QUESTION_ID|'
+    rb'VENDOR_DATA_QUESTION_ID|WORKER_COUNT|PAGE_SIZE)[ \t]*=[ \t]*'
+    rb'(?:"([^"\n]*)"|\'([^\'\n]*)\'|([^#\n]*?))[ \t\r]*(?:#[^\n]*)?$',
+    re.M
+)
+
+INT_CONFIG_KEYS = {'ORDER_DATA_QUESTION_ID', 'VENDOR_DATA_QUESTION_ID', 'WORKER_COUNT', 'PAGE_SIZE'}
+
 def extract_config_from_original() -> Dict[str, Any]:
     """Extract configuration from original app.py"""
     config = {}
     
     try:
         if Path('app.py').exists():
-            with open('app.py', 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Extract configuration values using simple string parsing
-                lines = content.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if 'METABASE_URL' in line and '=' in line:
-                        config['METABASE_URL'] = line.split('=')[1].strip().strip('"\'')
-                    elif 'METABASE_USERNAME' in line and '=' in line:
-                        config['METABASE_USERNAME'] = line.split('=')[1].strip().strip('"\'')
-                    elif 'METABASE_PASSWORD' in line and '=' in line:
-                        config['METABASE_PASSWORD'] = line.split('=')[1].strip().strip('"\'')
-                    elif 'ORDER_DATA_QUESTION_ID' in line and '=' in line:
-                        try:
-                            config['ORDER_DATA_QUESTION_ID'] = int(line.split('=')[1].strip())
-                        except ValueError:
-                            pass
-                    elif 'VENDOR_DATA_QUESTION_ID' in line and '=' in line:
-                        try:
-                            config['VENDOR_DATA_QUESTION_ID'] = int(line.split('=')[1].strip())
-                        except ValueError:
-                            pass
-                    elif 'WORKER_COUNT' in line and '=' in line:
-                        try:
-                            config['WORKER_COUNT'] = int(line.split('=')[1].strip())
-                        except ValueError:
-                            pass
-                    elif 'PAGE_SIZE' in line and '=' in line:
-                        try:
-                            config['PAGE_SIZE'] = int(line.split('=')[1].strip())
-                        except ValueError:
-                            pass
-                
-                logger.info("Extracted configuration from original app.py")
+            with open('app.py', 'rb') as f:
+                # mmap rejects empty files, and an empty app.py has nothing to extract
+                if os.fstat(f.fileno()).st_size:
+                    # Scan the page-cache-backed mapping directly; only matched groups are decoded
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        for match in CONFIG_ASSIGNMENT_PATTERN.finditer(content):
+                            name = match.group(1).decode('ascii')
+                            raw_value = next(group for group in match.groups()[1:] if group is not None)
+                            value = raw_value.decode('utf-8').strip()
+                            if name in config:
+                                continue
+                            if name in INT_CONFIG_KEYS:
+                                try:
+                                    config[name] = int(value)
+                                except ValueError:
+                                    pass
+                            else:
+                                config[name] = value
+            
+            logger.info("Extracted configuration from original app.py")
                 
     except Exception as e:
-        logger.warning(f"Could not extract configuration from app.py: {e}")
+        logger.warning("Could not extract configuration from app.py: %s", e)
     
     return config
 
-def create_env_file(config: Dict[str, Any]):
+def _write_file(path: str, content: str, mode: int = 0o644):
+    """Write a small text file with a single open/write on a raw descriptor"""
+    data = memoryview(content.encode('utf-8'))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), mode)
+    try:
+        if hasattr(os, 'fchmod'):
+            # The mode argument only applies on creation; enforce it on existing files too
+            os.fchmod(fd, mode)
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def create_env_file(config: Dict[str, Any], generated_at: str):
     """Create .env file with extracted configuration"""
     env_content = f"""# Tapsi Food Map Dashboard - Environment Configuration
-# Generated by migration script on {datetime.now().isoformat()}
+# Generated by migration script on {generated_at}
 
 # Metabase Configuration
 METABASE_URL={config.get('METABASE_URL', 'https://metabase.ofood.cloud')}
@@ -170,8 +272,8 @@ MAX_COVERAGE_CACHE_SIZE=1000
 MAX_HEATMAP_CACHE_SIZE=500
 """
     
-    with open('.env', 'w', encoding='utf-8') as f:
-        f.write(env_content)
+    # Contains Metabase credentials, so keep it readable by the owner only
+    _write_file('.env', env_content, mode=0o600)
     
     logger.info("Created .env file with configuration")
 
@@ -188,20 +290,26 @@ def check_data_directories():
     missing_dirs = []
     existing_dirs = []
     
+    # One directory listing per parent instead of one stat per path
+    listings: Dict[str, Dict[str, bool]] = {}
     for dir_path in required_dirs:
-        if Path(dir_path).exists():
+        parent, _, name = dir_path.rpartition('/')
+        parent = parent or '.'
+        if parent not in listings:
+            listings[parent] = _list_dir(parent)
+        if listings[parent].get(name):
             existing_dirs.append(dir_path)
         else:
             missing_dirs.append(dir_path)
     
-    logger.info(f"Found {len(existing_dirs)} required directories")
+    logger.info("Found %s required directories", len(existing_dirs))
     for dir_path in existing_dirs:
-        logger.info(f"  ✓ {dir_path}")
+        logger.info("  ✓ %s", dir_path)
     
     if missing_dirs:
-        logger.warning(f"Missing {len(missing_dirs)} directories:")
+        logger.warning("Missing %s directories:", len(missing_dirs))
         for dir_path in missing_dirs:
-            logger.warning(f"  ✗ {dir_path}")
+            logger.warning("  ✗ %s", dir_path)
     
     return existing_dirs, missing_dirs
 
@@ -209,7 +317,8 @@ def initialize_database():
     """Initialize the new database"""
     try:
         # Import the new modules
-        sys.path.insert(0, '.')
+        if '.' not in sys.path:
+            sys.path.insert(0, '.')
         from models import DatabaseManager
         from config import get_config
         
@@ -220,12 +329,12 @@ def initialize_database():
         
         # Get database stats
         stats = db_manager.get_database_stats()
-        logger.info(f"Database stats: {stats}")
+        logger.info("Database stats: %s", stats)
         
         return True
         
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         return False
 
 def test_new_system():
@@ -244,48 +353,49 @@ def test_new_system():
             from app_optimized import db_manager
             if db_manager:
                 stats = db_manager.get_database_stats()
-                logger.info(f"System test successful. Database stats: {stats}")
+                logger.info("System test successful. Database stats: %s", stats)
                 return True
             else:
                 logger.error("Database manager not initialized")
                 return False
         
     except Exception as e:
-        logger.error(f"System test failed: {e}")
+        logger.error("System test failed: %s", e)
         return False
 
-def create_migration_report(original_files: Dict[str, bool], 
+def create_migration_report(original_files: Dict[str, Optional[Path]], 
                           backed_up_files: list,
-                          missing_dirs: list) -> str:
+                          missing_dirs: list,
+                          generated_at: str) -> str:
     """Create a migration report"""
-    report = f"""
+    parts = [f"""
 # Tapsi Food Map Dashboard - Migration Report
-Generated: {datetime.now().isoformat()}
+Generated: {generated_at}
 
 ## Original Files Status
-"""
+"""]
     
-    for file_name, exists in original_files.items():
-        status = "✓ Found" if exists else "✗ Missing"
-        report += f"- {file_name}: {status}\n"
+    for file_name, path in original_files.items():
+        status = "✓ Found" if path is not None else "✗ Missing"
+        parts.append(f"- {file_name}: {status}\n")
     
-    report += f"""
+    parts.append(f"""
 ## Backup Status
 Backed up {len(backed_up_files)} files to backup_original/:
-"""
+""")
     
     for file_name in backed_up_files:
-        report += f"- {file_name}\n"
+        parts.append(f"- {file_name}\n")
     
     if missing_dirs:
-        report += f"""
+        parts.append("""
 ## Missing Data Directories
 ⚠️  The following directories are missing and may affect functionality:
-"""
+""")
         for dir_path in missing_dirs:
-            report += f"- {dir_path}\n"
+            parts.append(f"- {dir_path}\n")
     
-    report += """
+    parts.append("""
 ## Next Steps
 1. Review the generated .env file and update credentials if needed
 2. Install new requirements: pip install -r requirements.txt
@@ -301,9 +411,9 @@ If you need to rollback to the original system:
 ## Support
 If you encounter issues, check the logs and ensure all data directories
 are properly populated with your organization's data files.
-"""
+""")
     
-    return report
+    return ''.join(parts)
 
 def main():
     """Main migration function"""
@@ -311,13 +421,16 @@ def main():
     logger.info("Tapsi Food Map Dashboard - Migration to Optimized Version")
     logger.info("=" * 60)
     
+    # Shared by .env and the report so both carry the same timestamp
+    run_timestamp = datetime.now().isoformat()
+    
     # Check original files
     logger.info("Step 1: Checking original files...")
     original_files = check_original_files()
     
     # Create backup
     logger.info("Step 2: Creating backup...")
-    backed_up_files = backup_original_files()
+    backed_up_files = backup_original_files(original_files)
     
     # Extract configuration
     logger.info("Step 3: Extracting configuration...")
@@ -325,34 +438,42 @@ def main():
     
     # Create .env file
     logger.info("Step 4: Creating environment configuration...")
-    create_env_file(config)
+    create_env_file(config, run_timestamp)
     
     # Check data directories
     logger.info("Step 5: Checking data directories...")
     existing_dirs, missing_dirs = check_data_directories()
     
     # Initialize database
+    # Only import the optimized modules (pandas, flask, ...) when the step can succeed
     logger.info("Step 6: Initializing database...")
-    db_success = initialize_database()
+    if Path('models.py').exists():
+        db_success = initialize_database()
+    else:
+        logger.error("models.py not found, skipping database initialization")
+        db_success = False
     
     # Test new system
     logger.info("Step 7: Testing new system...")
-    test_success = test_new_system()
+    if db_success:
+        test_success = test_new_system()
+    else:
+        logger.warning("Skipping system test because database initialization failed")
+        test_success = False
     
     # Create migration report
-    report = create_migration_report(original_files, backed_up_files, missing_dirs)
+    report = create_migration_report(original_files, backed_up_files, missing_dirs, run_timestamp)
     
-    with open('migration_report.md', 'w', encoding='utf-8') as f:
-        f.write(report)
+    _write_file('migration_report.md', report)
     
     # Final status
     logger.info("=" * 60)
     logger.info("Migration Summary:")
-    logger.info(f"  Original files found: {sum(original_files.values())}/{len(original_files)}")
-    logger.info(f"  Files backed up: {len(backed_up_files)}")
-    logger.info(f"  Database initialization: {'✓' if db_success else '✗'}")
-    logger.info(f"  System test: {'✓' if test_success else '✗'}")
-    logger.info(f"  Missing data directories: {len(missing_dirs)}")
+    logger.info("  Original files found: %s/%s", sum(path is not None for path in original_files.values()), len(original_files))
+    logger.info("  Files backed up: %s", len(backed_up_files))
+    logger.info("  Database initialization: %s", '✓' if db_success else '✗')
+    logger.info("  System test: %s", '✓' if test_success else '✗')
+    logger.info("  Missing data directories: %s", len(missing_dirs))
     
     if db_success and test_success:
         logger.info("✅ Migration completed successfully!")
@@ -1,45 +1,281 @@
 # models.py - Database models and schema
+import atexit
+import os
 import sqlite3
+import queue
+import threading
+import time
 import pandas as pd
+import numpy as np
 import geopandas as gpd
 from datetime import datetime, timedelta
 import json
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
+from collections import OrderedDict
+from pathlib import Path
 import hashlib
+import zlib
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # Fall back to hashlib.blake2b
+    xxhash = None
 
 logger = logging.getLogger(__name__)
 
+# Column order used when writing orders and vendors
+ORDER_COLUMNS = [
+    'order_id', 'vendor_code', 'city_id', 'city_name', 'business_line',
+    'marketing_area', 'customer_latitude', 'customer_longitude',
+    'user_id', 'organic', 'created_at', 'imported_at'
+]
+
+VENDOR_COLUMNS = [
+    'vendor_code', 'vendor_name', 'city_id', 'city_name', 'business_line',
+    'latitude', 'longitude', 'radius', 'original_radius', 'status_id',
+    'visible', 'open', 'grade', 'updated_at'
+]
+
+# Columns returned by get_orders by default, and the dtypes they are read as
+ORDER_READ_COLUMNS = [col for col in ORDER_COLUMNS if col != 'imported_at']
+
+ORDER_READ_DTYPES = {
+    # float64: heatmaps round coordinates to up to 5 decimals and return them as-is
+    'customer_latitude': 'float64',
+    'customer_longitude': 'float64',
+    'city_id': 'Int32',  # Nullable, as the column may hold NULLs
+}
+
+# Tables whose row counts are maintained in table_counts
+COUNTED_TABLES = ('orders', 'vendors')
+
+# Cache tables written through the background writer, and their insert statements
+CACHE_TABLES = ('coverage_grid_cache', 'heatmap_cache')
+
+CACHE_INSERT_SQL = {
+    'coverage_grid_cache': """
+        INSERT OR REPLACE INTO coverage_grid_cache 
+        (cache_key, city_name, business_line, vendor_filters, point_count, grid_data)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'heatmap_cache': """
+        INSERT OR REPLACE INTO heatmap_cache 
+        (cache_key, heatmap_type, city_name, date_range, business_line, zoom_level, heatmap_data)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+CACHE_FLUSH_BATCH = 100  # Queued cache writes persisted per transaction
+CACHE_FLUSH_INTERVAL = 1.0  # Seconds to wait for a batch to fill
+# Connections carried across fork(); referenced so they are never finalized
+_INHERITED_CONNECTIONS: List[sqlite3.Connection] = []
+
+CACHE_BLOB_CHUNK_SIZE = 256 * 1024  # Compressed bytes read per blob chunk
+# Decoded payloads kept in process. Coverage grids are excluded: they can decode
+# to tens of MB and CoverageGridCacheManager already holds the hot ones
+MEMORY_CACHE_TABLES = ('heatmap_cache',)
+MEMORY_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Budget in estimated decoded bytes, per process
+DECODED_BYTES_PER_JSON_BYTE = 6  # Python objects vs their JSON text, measured on heatmap points
+# Seconds a decoded payload is served from memory. clear_cache_table only reaches
+# this process, so under gunicorn (scheduler in the master) a worker may serve a
+# cleared heatmap for up to this long
+MEMORY_CACHE_TTL = 30.0
+NEGATIVE_CACHE_SIZE = 1024  # Cache misses remembered, for any cache table
+NEGATIVE_CACHE_TTL = 30.0  # Seconds a cache miss is remembered
+_CACHE_MISS = object()
+
+# Format timestamps are stored in, matching fix_data_types.fix_timestamp_columns
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Prepared statements kept per connection, and generated SQL texts memoized per manager
+STATEMENT_CACHE_SIZE = 512
+
+WRITER_CACHE_SIZE = -65536  # 64MB page cache (negative values are KiB)
+READER_CACHE_SIZE = -4096  # 4MB per pooled reader connection
+
+# Approximate length of one degree of latitude, used to size vendor coverage boxes
+KM_PER_DEGREE_LAT = 111.32
+
+# Unique keys the upserts resolve conflicts on
+ORDER_CONFLICT_COLUMNS = ['order_id', 'vendor_code', 'created_at']
+VENDOR_CONFLICT_COLUMNS = ['vendor_code']
+
+def _to_db_timestamp(value: Any) -> Any:
+    """Render datetimes in the stored timestamp format; other values pass through"""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value
+
+def _format_timestamp_column(series: pd.Series) -> pd.Series:
+    """Render a timestamp column in the stored format with vectorized strftime"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime(TIMESTAMP_FORMAT)
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return series
+    # Parse text/object columns so every source spelling lands on the same string
+    parsed = pd.to_datetime(series, errors='coerce', format='ISO8601')
+    if not pd.api.types.is_datetime64_any_dtype(parsed):
+        # Mixed naive/aware values can't share a dtype; leave them to the caller
+        return series
+    # Values that don't parse are kept as they are
+    return parsed.dt.strftime(TIMESTAMP_FORMAT).where(parsed.notna(), series)
+
+def _json_list_param(values, as_text: bool = False) -> str:
+    """Encode filter values as one JSON array bound to an IN (... json_each(?)) clause"""
+    # json_each values have no affinity, so TEXT-column filters compare as strings
+    if as_text:
+        values = [value if value is None else str(value) for value in values]
+    else:
+        values = list(values)
+    if orjson is not None:
+        return orjson.dumps(values, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(values, default=lambda value: value.item())
+
+def _serialize_cache_payload(data: Any) -> bytes:
+    """Serialize a cache payload to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data).encode('utf-8')
+
+def _encode_cache_blob(data: Any) -> bytes:
+    """Serialize a cache payload to zlib-compressed JSON bytes"""
+    return zlib.compress(_serialize_cache_payload(data), 1)
+
+def _upsert_clause(columns: List[str], conflict_columns: List[str]) -> str:
+    """Build an ON CONFLICT ... DO UPDATE clause that updates the row in place"""
+    updates = ", ".join(
+        f"{col} = excluded.{col}" for col in columns if col not in conflict_columns
+    )
+    return f" ON CONFLICT({', '.join(conflict_columns)}) DO UPDATE SET {updates}"
+
 class DatabaseManager:
     """Manages all database operations with connection pooling and proper error handling"""
     
-    def __init__(self, db_path: str = "tapsi_food_data.db"):
+    def __init__(self, db_path: str = "tapsi_food_data.db", pool_size: int = 8):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._stmt_cache: Dict[tuple, str] = {}
+        
+        # A single writer behind a lock; under WAL readers never block on it
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
         self.init_database()
+        self._start_cache_writer()
+        self._read_pool = self._open_read_pool()
+        # The writer thread is a daemon; persist what it still holds on interpreter exit
+        atexit.register(self.flush_cache_writes)
+    
+    def _open_read_pool(self) -> Optional[queue.Queue]:
+        """Open the read-only connection pool"""
+        # Every connection to ":memory:" is its own database, so reads share the writer
+        if self.db_path == ":memory:":
+            return None
+        read_pool = queue.Queue(maxsize=self.pool_size)
+        for _ in range(self.pool_size):
+            read_pool.put(self._connect(read_only=True))
+        return read_pool
+    
+    def reinit_pool(self):
+        """Replace connections, locks and the cache writer inherited across fork(); call in the child"""
+        if self.db_path == ":memory:":
+            # The child's copy of an in-memory database is private; only the locks need replacing
+            self._write_lock = threading.Lock()
+            self._start_cache_writer()
+            return
+        
+        # Never use or close these here: closing releases locks and may checkpoint
+        # the WAL the parent is still using, so they're parked for the process lifetime
+        _INHERITED_CONNECTIONS.append(self._write_conn)
+        if self._read_pool is not None:
+            # Read the underlying deque directly: the Queue's own mutex may have
+            # been held by a parent thread at fork time and would never be released
+            _INHERITED_CONNECTIONS.extend(self._read_pool.queue)
+        
+        # A parent thread may have held the lock at fork time, and threads don't survive fork
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
+        self._start_cache_writer()
+        self._read_pool = self._open_read_pool()
+        logger.info(f"Reopened database connections in process {os.getpid()}")
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a long-lived connection and apply the per-connection PRAGMAs once"""
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE,
+                                   isolation_level=None, detect_types=0)
+        else:
+            # Autocommit mode: transactions are opened explicitly with BEGIN where needed
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE,
+                                   isolation_level=None, detect_types=0)
+            # Only takes effect on a new file, and must precede the switch to WAL
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")  # Better for concurrent access
+            conn.execute("PRAGMA synchronous = NORMAL")  # Balance between safety and speed
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 30000")  # Wait for locks instead of failing with SQLITE_BUSY
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256MB memory-mapped reads for large cache blobs
+        # Page caches are private to each connection; readers also share the mmap'd file pages
+        conn.execute(f"PRAGMA cache_size = {READER_CACHE_SIZE if read_only else WRITER_CACHE_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+    
+    def _remember_statement(self, signature: tuple, sql: str):
+        """Memoize generated SQL, bounded so unusual filter shapes can't grow it forever"""
+        if len(self._stmt_cache) >= STATEMENT_CACHE_SIZE:
+            self._stmt_cache.clear()
+        self._stmt_cache[signature] = sql
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections with proper cleanup"""
-        conn = None
+        """Use the shared write connection, serialized across threads"""
+        with self._write_lock:
+            conn = self._write_conn
+            try:
+                yield conn
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Database error: {e}")
+                raise
+            finally:
+                # Uncommitted work is discarded, as it was when connections were closed
+                if conn.in_transaction:
+                    conn.rollback()
+    
+    @contextmanager
+    def get_read_connection(self):
+        """Borrow a read-only connection from the pool"""
+        if self._read_pool is None:
+            with self.get_connection() as conn:
+                yield conn
+            return
+        
+        conn = self._read_pool.get()
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA foreign_keys = ON")
-            conn.execute("PRAGMA journal_mode = WAL")  # Better for concurrent access
-            conn.execute("PRAGMA synchronous = NORMAL")  # Balance between safety and speed
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            # End the read snapshot so WAL checkpoints aren't held back
+            if conn.in_transaction:
+                conn.rollback()
+            self._read_pool.put(conn)
     
     def init_database(self):
         """Initialize database with all required tables and indexes"""
         with self.get_connection() as conn:
+            conn.execute("BEGIN")
+            
             # Metadata table for tracking updates
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS metadata (
@@ -98,7 +334,7 @@ class DatabaseManager:
                     city_name TEXT,
                     business_line TEXT,
                     vendor_filters TEXT,  -- JSON string of filters
-                    grid_data TEXT,       -- JSON string of grid results
+                    grid_data BLOB,       -- zlib-compressed JSON of grid results
                     point_count INTEGER,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -115,21 +351,152 @@ class DatabaseManager:
                     date_range TEXT,
                     business_line TEXT,
                     zoom_level INTEGER,
-                    heatmap_data TEXT,    -- JSON string of heatmap points
+                    heatmap_data BLOB,    -- zlib-compressed JSON of heatmap points
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
             
             # Create indexes for performance
             self._create_indexes(conn)
+            self._create_spatial_indexes(conn)
+            self._create_row_counters(conn)
             conn.commit()
             
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.info("Database predates auto_vacuum=INCREMENTAL; run VACUUM once to let cleanup reclaim space")
+            
+    def _create_spatial_indexes(self, conn):
+        """Create R-tree indexes over order points and vendor coverage boxes"""
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('orders_rtree', 'vendors_rtree')"
+        )}
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS orders_rtree
+                USING rtree(id, min_lat, max_lat, min_lon, max_lon)
+            """)
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS vendors_rtree
+                USING rtree(id, min_lat, max_lat, min_lon, max_lon)
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"R-tree module unavailable, bounding-box queries will scan: {e}")
+            self.has_spatial_index = False
+            return
+        self.has_spatial_index = True
+        
+        # Orders are points, so the index can be kept in sync entirely in SQL
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS orders_rtree_insert AFTER INSERT ON orders
+            WHEN new.customer_latitude IS NOT NULL AND new.customer_longitude IS NOT NULL
+            BEGIN
+                INSERT OR REPLACE INTO orders_rtree VALUES (
+                    new.id, new.customer_latitude, new.customer_latitude,
+                    new.customer_longitude, new.customer_longitude
+                );
+            END
+        """)
+        # Upserts rewrite the coordinates on every conflict, so only fire on a real move.
+        # Recreated each start so databases with the older unconditional trigger pick it up
+        conn.execute("DROP TRIGGER IF EXISTS orders_rtree_update")
+        conn.execute("""
+            CREATE TRIGGER orders_rtree_update
+            AFTER UPDATE OF customer_latitude, customer_longitude ON orders
+            WHEN old.customer_latitude IS NOT new.customer_latitude
+              OR old.customer_longitude IS NOT new.customer_longitude
+            BEGIN
+                DELETE FROM orders_rtree WHERE id = old.id;
+                INSERT INTO orders_rtree
+                SELECT new.id, new.customer_latitude, new.customer_latitude,
+                       new.customer_longitude, new.customer_longitude
+                WHERE new.customer_latitude IS NOT NULL AND new.customer_longitude IS NOT NULL;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS orders_rtree_delete AFTER DELETE ON orders
+            BEGIN
+                DELETE FROM orders_rtree WHERE id = old.id;
+            END
+        """)
+        
+        # Backfill indexes created against an already populated database
+        if 'orders_rtree' not in existing:
+            conn.execute("""
+                INSERT INTO orders_rtree
+                SELECT id, customer_latitude, customer_latitude, customer_longitude, customer_longitude
+                FROM orders
+                WHERE customer_latitude IS NOT NULL AND customer_longitude IS NOT NULL
+            """)
+        if 'vendors_rtree' not in existing:
+            df_vendors = pd.read_sql_query(
+                "SELECT vendor_code, latitude, longitude, radius FROM vendors", conn
+            )
+            self._index_vendor_coverage(conn, df_vendors)
+    
+    def _create_row_counters(self, conn):
+        """Keep exact row counts for the large tables in table_counts via triggers"""
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'table_counts'"
+        ).fetchone() is None
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS table_counts (
+                name TEXT PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Upserts that hit ON CONFLICT run as UPDATEs, so only real inserts and deletes count
+        for table in COUNTED_TABLES:
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table}
+                BEGIN
+                    UPDATE table_counts SET n = n + 1 WHERE name = '{table}';
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE table_counts SET n = n - 1 WHERE name = '{table}';
+                END
+            """)
+            # Seed from a one-off scan when the counters are new to this database
+            if created:
+                conn.execute(f"INSERT INTO table_counts (name, n) SELECT '{table}', COUNT(*) FROM {table}")
+    
+    def _index_vendor_coverage(self, conn, df_vendors: pd.DataFrame):
+        """Store each vendor's coverage radius as a lat/lon box in vendors_rtree"""
+        if not self.has_spatial_index or df_vendors.empty:
+            return
+        
+        df = df_vendors.reindex(columns=['vendor_code', 'latitude', 'longitude', 'radius'])
+        df = df.dropna(subset=['vendor_code', 'latitude', 'longitude'])
+        lat = df['latitude'].to_numpy(dtype=float)
+        lon = df['longitude'].to_numpy(dtype=float)
+        radius_km = df['radius'].fillna(0).to_numpy(dtype=float)
+        
+        # Radius is in km; a degree of longitude shrinks with cos(latitude)
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * np.maximum(np.cos(np.radians(lat)), 1e-6))
+        
+        conn.executemany("""
+            INSERT OR REPLACE INTO vendors_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT id, ?, ?, ?, ? FROM vendors WHERE vendor_code = ?
+        """, zip(
+            (lat - dlat).tolist(), (lat + dlat).tolist(),
+            (lon - dlon).tolist(), (lon + dlon).tolist(),
+            df['vendor_code'].tolist()
+        ))
+            
     def _create_indexes(self, conn):
         """Create all necessary indexes for optimal query performance"""
         indexes = [
-            # Orders indexes
-            "CREATE INDEX IF NOT EXISTS idx_orders_city_name ON orders(city_name)",
-            "CREATE INDEX IF NOT EXISTS idx_orders_business_line ON orders(business_line)",
+            # Orders indexes; the composites serve get_orders' filters in ORDER BY order
+            "CREATE INDEX IF NOT EXISTS idx_orders_city_bl_date ON orders(city_name, business_line, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_citydate ON orders(city_name, created_at DESC)",
+            # Subsumed by the composites above; dropped to cut write amplification on upserts
+            "DROP INDEX IF EXISTS idx_orders_city_name",
+            "DROP INDEX IF EXISTS idx_orders_business_line",
+            # get_orders(vendor_codes=...) with city "all" has no other usable index
             "CREATE INDEX IF NOT EXISTS idx_orders_vendor_code ON orders(vendor_code)",
             "CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)",
             "CREATE INDEX IF NOT EXISTS idx_orders_location ON orders(customer_latitude, customer_longitude)",
@@ -145,65 +512,78 @@ class DatabaseManager:
             "CREATE INDEX IF NOT EXISTS idx_vendors_visible ON vendors(visible)",
             "CREATE INDEX IF NOT EXISTS idx_vendors_open ON vendors(open)",
             
-            # Cache indexes
-            "CREATE INDEX IF NOT EXISTS idx_coverage_cache_key ON coverage_grid_cache(cache_key)",
+            # Cache indexes; cache_key lookups use the UNIQUE constraint's own index
+            "DROP INDEX IF EXISTS idx_coverage_cache_key",
             "CREATE INDEX IF NOT EXISTS idx_coverage_city_bl ON coverage_grid_cache(city_name, business_line)",
             "CREATE INDEX IF NOT EXISTS idx_coverage_accessed ON coverage_grid_cache(last_accessed)",
-            "CREATE INDEX IF NOT EXISTS idx_heatmap_cache_key ON heatmap_cache(cache_key)",
+            "DROP INDEX IF EXISTS idx_heatmap_cache_key",
             "CREATE INDEX IF NOT EXISTS idx_heatmap_type_city ON heatmap_cache(heatmap_type, city_name)"
         ]
         
+        # Runs inside init_database's transaction, so the build is all-or-nothing
+        # and a failure aborts startup instead of leaving a query unindexed
         for index_sql in indexes:
-            try:
-                conn.execute(index_sql)
-            except sqlite3.Error as e:
-                logger.warning(f"Could not create index: {e}")
+            conn.execute(index_sql)
+
+    def _insert_multi_row(self, cursor, insert_prefix: str, n_columns: int,
+                          rows: List[tuple], rows_per_statement: int = 500,
+                          suffix: str = "") -> int:
+        """Insert rows using multi-row VALUES statements of a fixed shape"""
+        if not rows:
+            return 0
+        
+        # Stay under the per-statement bound parameter limit
+        try:
+            max_variables = cursor.connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        except AttributeError:  # Python < 3.11
+            max_variables = 999
+        rows_per_statement = max(1, min(rows_per_statement, max_variables // n_columns))
+        
+        row_placeholder = "(" + ", ".join(["?"] * n_columns) + ")"
+        
+        def statement(n_rows: int) -> str:
+            return f"{insert_prefix} " + ", ".join([row_placeholder] * n_rows) + suffix
+        
+        def flatten(chunk: List[tuple]) -> List[Any]:
+            return [value for row in chunk for value in row]
+        
+        n_full = len(rows) // rows_per_statement * rows_per_statement
+        if n_full:
+            # One prepared statement reused for every full chunk
+            cursor.executemany(statement(rows_per_statement), (
+                flatten(rows[i:i + rows_per_statement])
+                for i in range(0, n_full, rows_per_statement)
+            ))
+        if n_full < len(rows):
+            cursor.execute(statement(len(rows) - n_full), flatten(rows[n_full:]))
+        
+        return len(rows)
 
     def upsert_orders(self, df_orders: pd.DataFrame) -> int:
         """Insert or update orders data with conflict resolution"""
         if df_orders.empty:
             return 0
             
-        # Prepare data
+        # Prepare data; timestamps are bound as preformatted strings, not via adapters
         df_clean = df_orders.copy()
-        df_clean['imported_at'] = datetime.now()
+        df_clean['imported_at'] = datetime.now().strftime(TIMESTAMP_FORMAT)
+        if 'created_at' in df_clean.columns:
+            df_clean['created_at'] = _format_timestamp_column(df_clean['created_at'])
         
-        # Convert to records for insertion
-        records = df_clean.to_dict('records')
+        # Build row tuples straight from the columns; missing columns become NULL
+        rows = list(df_clean.reindex(columns=ORDER_COLUMNS).itertuples(index=False, name=None))
         
         with self.get_connection() as conn:
+            # Take the write lock up front so every chunk shares one transaction and one fsync
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
             
-            # Use INSERT OR REPLACE for upsert behavior
-            insert_sql = """
-                INSERT OR REPLACE INTO orders (
-                    order_id, vendor_code, city_id, city_name, business_line,
-                    marketing_area, customer_latitude, customer_longitude,
-                    user_id, organic, created_at, imported_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            # Batch insert for performance
-            batch_size = 1000
-            inserted_count = 0
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i + batch_size]
-                batch_data = [
-                    (
-                        r.get('order_id'), r.get('vendor_code'), r.get('city_id'),
-                        r.get('city_name'), r.get('business_line'), r.get('marketing_area'),
-                        r.get('customer_latitude'), r.get('customer_longitude'),
-                        r.get('user_id'), r.get('organic'), r.get('created_at'),
-                        r.get('imported_at')
-                    ) for r in batch
-                ]
-                
-                cursor.executemany(insert_sql, batch_data)
-                inserted_count += len(batch)
-                
-                if i % 10000 == 0:  # Progress logging
-                    logger.info(f"Inserted {inserted_count}/{len(records)} orders...")
+            # Update conflicting rows in place rather than delete + reinsert
+            insert_prefix = f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) VALUES"
+            inserted_count = self._insert_multi_row(
+                cursor, insert_prefix, len(ORDER_COLUMNS), rows,
+                suffix=_upsert_clause(ORDER_COLUMNS, ORDER_CONFLICT_COLUMNS)
+            )
             
             conn.commit()
             logger.info(f"Successfully upserted {inserted_count} orders")
@@ -215,79 +595,115 @@ class DatabaseManager:
             return 0
             
         df_clean = df_vendors.copy()
-        df_clean['updated_at'] = datetime.now()
-        records = df_clean.to_dict('records')
+        df_clean['updated_at'] = datetime.now().strftime(TIMESTAMP_FORMAT)
+        rows = list(df_clean.reindex(columns=VENDOR_COLUMNS).itertuples(index=False, name=None))
         
         with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
             
-            insert_sql = """
-                INSERT OR REPLACE INTO vendors (
-                    vendor_code, vendor_name, city_id, city_name, business_line,
-                    latitude, longitude, radius, original_radius, status_id,
-                    visible, open, grade, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            batch_data = [
-                (
-                    r.get('vendor_code'), r.get('vendor_name'), r.get('city_id'),
-                    r.get('city_name'), r.get('business_line'), r.get('latitude'),
-                    r.get('longitude'), r.get('radius'), r.get('original_radius'),
-                    r.get('status_id'), r.get('visible'), r.get('open'),
-                    r.get('grade'), r.get('updated_at')
-                ) for r in records
-            ]
-            
-            cursor.executemany(insert_sql, batch_data)
+            insert_prefix = f"INSERT INTO vendors ({', '.join(VENDOR_COLUMNS)}) VALUES"
+            inserted_count = self._insert_multi_row(
+                cursor, insert_prefix, len(VENDOR_COLUMNS), rows,
+                suffix=_upsert_clause(VENDOR_COLUMNS, VENDOR_CONFLICT_COLUMNS)
+            )
+            self._index_vendor_coverage(conn, df_clean)
             conn.commit()
             
-            logger.info(f"Successfully upserted {len(records)} vendors")
-            return len(records)
+            logger.info(f"Successfully upserted {inserted_count} vendors")
+            return inserted_count
 
     def get_orders(self, 
                    city_name: Optional[str] = None,
                    start_date: Optional[datetime] = None,
                    end_date: Optional[datetime] = None,
                    business_lines: Optional[List[str]] = None,
-                   vendor_codes: Optional[List[str]] = None) -> pd.DataFrame:
-        """Retrieve filtered orders data"""
+                   vendor_codes: Optional[List[str]] = None,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Retrieve filtered orders data, projected onto the requested columns"""
+        columns = columns or ORDER_READ_COLUMNS
+        unknown = set(columns) - set(ORDER_READ_COLUMNS) - {'id', 'imported_at'}
+        if unknown:
+            raise ValueError(f"Unknown orders columns: {sorted(unknown)}")
         
-        where_conditions = []
+        has_city = bool(city_name and city_name != "all")
         params = []
-        
-        if city_name and city_name != "all":
-            where_conditions.append("city_name = ?")
+        if has_city:
             params.append(city_name)
-            
         if start_date:
-            where_conditions.append("created_at >= ?")
-            params.append(start_date)
-            
+            params.append(_to_db_timestamp(start_date))
         if end_date:
-            where_conditions.append("created_at <= ?")
-            params.append(end_date)
-            
+            params.append(_to_db_timestamp(end_date))
+        # Lists are bound as one JSON array each, so the SQL text doesn't grow with them
         if business_lines:
-            placeholders = ','.join(['?' for _ in business_lines])
-            where_conditions.append(f"business_line IN ({placeholders})")
-            params.extend(business_lines)
-            
+            params.append(_json_list_param(business_lines, as_text=True))
         if vendor_codes:
-            placeholders = ','.join(['?' for _ in vendor_codes])
-            where_conditions.append(f"vendor_code IN ({placeholders})")
-            params.extend(vendor_codes)
+            params.append(_json_list_param(vendor_codes, as_text=True))
         
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        # Identical filter shapes share one SQL text, so SQLite's statement cache hits
+        signature = ('orders', tuple(columns), has_city, bool(start_date), bool(end_date),
+                     bool(business_lines), bool(vendor_codes))
+        sql = self._stmt_cache.get(signature)
+        if sql is None:
+            where_conditions = []
+            if has_city:
+                where_conditions.append("city_name = ?")
+            if start_date:
+                where_conditions.append("created_at >= ?")
+            if end_date:
+                where_conditions.append("created_at <= ?")
+            if business_lines:
+                where_conditions.append("business_line IN (SELECT value FROM json_each(?))")
+            if vendor_codes:
+                where_conditions.append("vendor_code IN (SELECT value FROM json_each(?))")
+            
+            where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+            
+            sql = f"""
+                SELECT {', '.join(columns)} FROM orders 
+                {where_clause}
+                ORDER BY created_at DESC
+            """
+            self._remember_statement(signature, sql)
         
-        sql = f"""
-            SELECT * FROM orders 
-            {where_clause}
-            ORDER BY created_at DESC
+        # Explicit dtypes skip per-chunk inference
+        dtype = {col: ORDER_READ_DTYPES[col] for col in columns if col in ORDER_READ_DTYPES}
+        
+        with self.get_read_connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params, dtype=dtype)
+
+    def get_orders_in_bbox(self, min_lat: float, max_lat: float,
+                           min_lon: float, max_lon: float,
+                           columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Retrieve orders whose customer location falls inside a bounding box"""
+        columns = columns or ORDER_READ_COLUMNS
+        unknown = set(columns) - set(ORDER_READ_COLUMNS) - {'id', 'imported_at'}
+        if unknown:
+            raise ValueError(f"Unknown orders columns: {sorted(unknown)}")
+        
+        select_list = ', '.join(f"o.{col}" for col in columns)
+        # The R-tree stores 32-bit bounds, so re-check the exact coordinates
+        exact_filter = """
+            o.customer_latitude BETWEEN ? AND ?
+            AND o.customer_longitude BETWEEN ? AND ?
         """
+        if self.has_spatial_index:
+            sql = f"""
+                SELECT {select_list} FROM orders_rtree r
+                JOIN orders o ON o.id = r.id
+                WHERE r.max_lat >= ? AND r.min_lat <= ?
+                AND r.max_lon >= ? AND r.min_lon <= ?
+                AND {exact_filter}
+            """
+            params = [min_lat, max_lat, min_lon, max_lon] * 2
+        else:
+            sql = f"SELECT {select_list} FROM orders o WHERE {exact_filter}"
+            params = [min_lat, max_lat, min_lon, max_lon]
         
-        with self.get_connection() as conn:
-            return pd.read_sql_query(sql, conn, params=params)
+        dtype = {col: ORDER_READ_DTYPES[col] for col in columns if col in ORDER_READ_DTYPES}
+        
+        with self.get_read_connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params, dtype=dtype)
 
     def get_vendors(self, 
                     city_name: Optional[str] = None,
@@ -298,91 +714,297 @@ class DatabaseManager:
                     visible: Optional[int] = None,
                     is_open: Optional[int] = None) -> pd.DataFrame:
         """Retrieve filtered vendors data"""
-        
-        where_conditions = []
+        has_city = bool(city_name and city_name != "all")
         params = []
-        
-        if city_name and city_name != "all":
-            where_conditions.append("city_name = ?")
+        if has_city:
             params.append(city_name)
-            
         if business_lines:
-            placeholders = ','.join(['?' for _ in business_lines])
-            where_conditions.append(f"business_line IN ({placeholders})")
-            params.extend(business_lines)
-            
+            params.append(_json_list_param(business_lines, as_text=True))
         if vendor_codes:
-            placeholders = ','.join(['?' for _ in vendor_codes])
-            where_conditions.append(f"vendor_code IN ({placeholders})")
-            params.extend(vendor_codes)
-            
+            params.append(_json_list_param(vendor_codes, as_text=True))
         if status_ids:
-            placeholders = ','.join(['?' for _ in status_ids])
-            where_conditions.append(f"status_id IN ({placeholders})")
-            params.extend(status_ids)
-            
+            params.append(_json_list_param(status_ids))
         if grades:
-            placeholders = ','.join(['?' for _ in grades])
-            where_conditions.append(f"grade IN ({placeholders})")
-            params.extend(grades)
-            
+            params.append(_json_list_param(grades, as_text=True))
         if visible is not None:
-            where_conditions.append("visible = ?")
             params.append(visible)
-            
         if is_open is not None:
-            where_conditions.append("open = ?")
             params.append(is_open)
         
-        where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-        
-        sql = f"SELECT * FROM vendors {where_clause}"
+        signature = ('vendors', has_city, bool(business_lines), bool(vendor_codes),
+                     bool(status_ids), bool(grades), visible is not None, is_open is not None)
+        sql = self._stmt_cache.get(signature)
+        if sql is None:
+            where_conditions = []
+            if has_city:
+                where_conditions.append("city_name = ?")
+            if business_lines:
+                where_conditions.append("business_line IN (SELECT value FROM json_each(?))")
+            if vendor_codes:
+                where_conditions.append("vendor_code IN (SELECT value FROM json_each(?))")
+            if status_ids:
+                where_conditions.append("status_id IN (SELECT value FROM json_each(?))")
+            if grades:
+                where_conditions.append("grade IN (SELECT value FROM json_each(?))")
+            if visible is not None:
+                where_conditions.append("visible = ?")
+            if is_open is not None:
+                where_conditions.append("open = ?")
+            
+            where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+            
+            sql = f"SELECT * FROM vendors {where_clause}"
+            self._remember_statement(signature, sql)
         
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             return pd.read_sql_query(sql, conn, params=params)
 
+    def _start_cache_writer(self):
+        """Start the background thread that persists queued cache writes"""
+        self._cache_queue: queue.Queue = queue.Queue()
+        self._cache_lock = threading.Lock()
+        # Queued but not yet persisted payloads, so reads see their own writes
+        self._pending_cache: Dict[Tuple[str, str], Any] = {}
+        # Bumped when a cache table is cleared so queued writes to it are dropped
+        self._cache_generation = {table: 0 for table in CACHE_TABLES}
+        # (payload, compressed size, expiry) of hot keys, most recent last
+        self._memory_cache: OrderedDict = OrderedDict()
+        self._memory_cache_bytes = 0
+        # Expiry times of recent misses, oldest first
+        self._miss_cache: OrderedDict = OrderedDict()
+        self._cache_writer = threading.Thread(
+            target=self._cache_writer_loop, name="cache-writer", daemon=True
+        )
+        self._cache_writer.start()
+    
+    def _cache_writer_loop(self):
+        """Drain the cache queue, persisting up to a batch per transaction"""
+        while True:
+            items = [self._cache_queue.get()]
+            deadline = time.monotonic() + CACHE_FLUSH_INTERVAL
+            while len(items) < CACHE_FLUSH_BATCH and items[-1][0] != 'flush':
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._cache_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_cache_items(items)
+    
+    def _write_cache_items(self, items: List[tuple]):
+        """Persist a batch of queued cache operations in one transaction"""
+        flush_events = [item[1] for item in items if item[0] == 'flush']
+        queued = [item for item in items if item[0] in CACHE_TABLES]
+        
+        # Encode up front, outside the write lock; a payload that can't be
+        # serialized is dropped on its own instead of failing the batch
+        statements = []
+        for item in items:
+            kind = item[0]
+            if kind == 'touch':
+                statements.append(item)
+            elif kind in CACHE_TABLES:
+                _, generation, cache_key, params, data = item
+                try:
+                    raw = _serialize_cache_payload(data)
+                    blob = zlib.compress(raw, 1)
+                except Exception as e:
+                    logger.error(f"Skipping cache write for {cache_key}: {e}")
+                    continue
+                statements.append((kind, generation, (*params, blob), cache_key, data, len(raw)))
+        
+        written = []
+        try:
+            with self.get_connection() as conn:
+                conn.execute("BEGIN")
+                for statement in statements:
+                    kind = statement[0]
+                    if kind == 'touch':
+                        conn.execute("""
+                            UPDATE coverage_grid_cache 
+                            SET last_accessed = CURRENT_TIMESTAMP 
+                            WHERE cache_key = ?
+                        """, (statement[1],))
+                    else:
+                        _, generation, params, cache_key, data, json_bytes = statement
+                        # Checked under the write lock, so a concurrent clear can't be undone
+                        if generation != self._cache_generation[kind]:
+                            continue
+                        conn.execute(CACHE_INSERT_SQL[kind], params)
+                        written.append((kind, cache_key, data, json_bytes, generation))
+                conn.commit()
+            
+            # Only committed payloads may be served from memory
+            for kind, cache_key, data, json_bytes, generation in written:
+                self._remember_cache_payload(kind, cache_key, data, json_bytes, generation)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(statements)} queued cache writes: {e}")
+        finally:
+            # Committed, skipped or rolled back, these writes are settled and
+            # must not keep being served from the pending map
+            with self._cache_lock:
+                for kind, _, cache_key, _, data in queued:
+                    # Keep the entry if a newer write for the same key is still queued
+                    if self._pending_cache.get((kind, cache_key)) is data:
+                        del self._pending_cache[(kind, cache_key)]
+            for event in flush_events:
+                event.set()
+    
+    def _queue_cache_write(self, table: str, cache_key: str, params: tuple, data: Any):
+        """Queue a cache row for the background writer; O(1), no fsync on the request path"""
+        with self._cache_lock:
+            self._pending_cache[(table, cache_key)] = data
+            generation = self._cache_generation[table]
+            # The pending map serves the key until the writer has stored it
+            self._forget_memory_cache((table, cache_key))
+        self._cache_queue.put((table, generation, cache_key, params, data))
+    
+    def _get_memory_cache(self, table: str, cache_key: str) -> Any:
+        """Look a key up in the pending writes and the in-process caches"""
+        # Returns the payload, None for a remembered miss, or _CACHE_MISS to consult SQLite
+        key = (table, cache_key)
+        now = time.monotonic()
+        with self._cache_lock:
+            pending = self._pending_cache.get(key)
+            if pending is not None:
+                return pending
+            entry = self._memory_cache.get(key)
+            if entry is not None:
+                data, _, expires = entry
+                if expires > now:
+                    self._memory_cache.move_to_end(key)
+                    return data
+                self._forget_memory_cache(key)
+            expires = self._miss_cache.get(key)
+            if expires is not None:
+                if expires > now:
+                    return None
+                del self._miss_cache[key]
+            return _CACHE_MISS
+    
+    def _forget_memory_cache(self, key: Tuple[str, str]):
+        """Drop a key from the in-process caches; call with _cache_lock held"""
+        entry = self._memory_cache.pop(key, None)
+        if entry is not None:
+            self._memory_cache_bytes -= entry[1]
+        self._miss_cache.pop(key, None)
+    
+    def _remember_cache_payload(self, table: str, cache_key: str, data: Any,
+                                json_bytes: int, generation: int):
+        """Keep a decoded payload in process, bounded by its estimated decoded size"""
+        key = (table, cache_key)
+        nbytes = json_bytes * DECODED_BYTES_PER_JSON_BYTE
+        with self._cache_lock:
+            # A clear since the read or write started makes the payload stale
+            if generation != self._cache_generation[table]:
+                return
+            self._forget_memory_cache(key)
+            if table not in MEMORY_CACHE_TABLES or nbytes > MEMORY_CACHE_MAX_BYTES:
+                return
+            self._memory_cache[key] = (data, nbytes, time.monotonic() + MEMORY_CACHE_TTL)
+            self._memory_cache_bytes += nbytes
+            while self._memory_cache_bytes > MEMORY_CACHE_MAX_BYTES:
+                _, (_, evicted_bytes, _) = self._memory_cache.popitem(last=False)
+                self._memory_cache_bytes -= evicted_bytes
+    
+    def _remember_cache_miss(self, table: str, cache_key: str, generation: int):
+        """Remember briefly that a key isn't cached, so repeat lookups skip SQLite"""
+        key = (table, cache_key)
+        with self._cache_lock:
+            if generation != self._cache_generation[table] or key in self._pending_cache:
+                return
+            self._miss_cache[key] = time.monotonic() + NEGATIVE_CACHE_TTL
+            self._miss_cache.move_to_end(key)
+            while len(self._miss_cache) > NEGATIVE_CACHE_SIZE:
+                self._miss_cache.popitem(last=False)
+    
+    def flush_cache_writes(self, timeout: float = 10.0) -> bool:
+        """Block until every cache write queued so far has been persisted"""
+        if not self._cache_writer.is_alive():
+            # Nothing would drain the queue (e.g. a forked child before reinit_pool)
+            return False
+        done = threading.Event()
+        self._cache_queue.put(('flush', done))
+        return done.wait(timeout)
+    
+    def clear_cache_table(self, table: str):
+        """Delete every row of a cache table, including writes still queued for it"""
+        if table not in CACHE_TABLES:
+            raise ValueError(f"Unknown cache table: {table}")
+        with self._cache_lock:
+            self._cache_generation[table] += 1
+            for key in [key for key in self._pending_cache if key[0] == table]:
+                del self._pending_cache[key]
+            for key in [key for key in (*self._memory_cache, *self._miss_cache) if key[0] == table]:
+                self._forget_memory_cache(key)
+        with self.get_connection() as conn:
+            conn.execute(f"DELETE FROM {table}")
+    
+    def _read_cache_payload(self, conn, table: str, column: str,
+                            cache_key: str) -> Optional[Tuple[Any, int]]:
+        """Decode a cached payload and return it with its JSON size, or None if not cached"""
+        # One snapshot for both steps, so a concurrent replace can't move the row
+        conn.execute("BEGIN")
+        row = conn.execute(
+            f"SELECT rowid, typeof({column}) FROM {table} WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        rowid, value_type = row
+        
+        if value_type != 'blob' or not hasattr(conn, 'blobopen'):
+            # Legacy TEXT rows, or Python < 3.11 without the blob API
+            value = conn.execute(f"SELECT {column} FROM {table} WHERE rowid = ?", (rowid,)).fetchone()[0]
+            if isinstance(value, str):
+                # Rows cached before payloads were compressed hold plain JSON text
+                return json.loads(value), len(value)
+            raw = zlib.decompress(value)
+        else:
+            # Decompress chunk by chunk so the full compressed blob is never held alongside the JSON
+            decompressor = zlib.decompressobj()
+            raw = bytearray()
+            with conn.blobopen(table, column, rowid, readonly=True) as blob:
+                while True:
+                    chunk = blob.read(CACHE_BLOB_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    raw += decompressor.decompress(chunk)
+            raw += decompressor.flush()
+        return (orjson.loads(raw) if orjson is not None else json.loads(raw)), len(raw)
+    
     def cache_coverage_grid(self, cache_key: str, city_name: str, 
                            business_line: str, vendor_filters: Dict[str, Any],
                            grid_data: List[Dict]) -> bool:
         """Cache coverage grid results"""
         try:
-            with self.get_connection() as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO coverage_grid_cache 
-                    (cache_key, city_name, business_line, vendor_filters, grid_data, point_count)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    cache_key, city_name, business_line,
-                    json.dumps(vendor_filters), json.dumps(grid_data), len(grid_data)
-                ))
-                conn.commit()
-                return True
+            self._queue_cache_write('coverage_grid_cache', cache_key, (
+                cache_key, city_name, business_line,
+                json.dumps(vendor_filters), len(grid_data)
+            ), grid_data)
+            return True
         except Exception as e:
             logger.error(f"Failed to cache coverage grid: {e}")
             return False
 
     def get_cached_coverage_grid(self, cache_key: str) -> Optional[List[Dict]]:
         """Retrieve cached coverage grid results"""
+        # Only pending writes and recent misses; decoded grids aren't kept here
+        cached = self._get_memory_cache('coverage_grid_cache', cache_key)
+        if cached is not _CACHE_MISS:
+            return cached
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT grid_data FROM coverage_grid_cache 
-                    WHERE cache_key = ?
-                """, (cache_key,))
-                
-                result = cursor.fetchone()
-                if result:
-                    # Update last accessed timestamp
-                    conn.execute("""
-                        UPDATE coverage_grid_cache 
-                        SET last_accessed = CURRENT_TIMESTAMP 
-                        WHERE cache_key = ?
-                    """, (cache_key,))
-                    conn.commit()
-                    
-                    return json.loads(result[0])
+            generation = self._cache_generation['coverage_grid_cache']
+            with self.get_read_connection() as conn:
+                result = self._read_cache_payload(conn, 'coverage_grid_cache', 'grid_data', cache_key)
+            
+            if result is None:
+                self._remember_cache_miss('coverage_grid_cache', cache_key, generation)
                 return None
+            # Update last accessed timestamp in the background
+            self._cache_queue.put(('touch', cache_key))
+            return result[0]
         except Exception as e:
             logger.error(f"Failed to retrieve cached coverage grid: {e}")
             return None
@@ -392,44 +1014,43 @@ class DatabaseManager:
                      heatmap_data: List[Dict]) -> bool:
         """Cache heatmap results"""
         try:
-            with self.get_connection() as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO heatmap_cache 
-                    (cache_key, heatmap_type, city_name, date_range, business_line, zoom_level, heatmap_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    cache_key, heatmap_type, city_name, date_range,
-                    business_line, zoom_level, json.dumps(heatmap_data)
-                ))
-                conn.commit()
-                return True
+            self._queue_cache_write('heatmap_cache', cache_key, (
+                cache_key, heatmap_type, city_name, date_range,
+                business_line, zoom_level
+            ), heatmap_data)
+            return True
         except Exception as e:
             logger.error(f"Failed to cache heatmap: {e}")
             return False
 
     def get_cached_heatmap(self, cache_key: str) -> Optional[List[Dict]]:
         """Retrieve cached heatmap results"""
+        cached = self._get_memory_cache('heatmap_cache', cache_key)
+        if cached is not _CACHE_MISS:
+            return cached
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT heatmap_data FROM heatmap_cache 
-                    WHERE cache_key = ?
-                """, (cache_key,))
-                
-                result = cursor.fetchone()
-                if result:
-                    return json.loads(result[0])
+            generation = self._cache_generation['heatmap_cache']
+            with self.get_read_connection() as conn:
+                result = self._read_cache_payload(conn, 'heatmap_cache', 'heatmap_data', cache_key)
+            
+            if result is None:
+                self._remember_cache_miss('heatmap_cache', cache_key, generation)
                 return None
+            data, json_bytes = result
+            self._remember_cache_payload('heatmap_cache', cache_key, data, json_bytes, generation)
+            return data
         except Exception as e:
             logger.error(f"Failed to retrieve cached heatmap: {e}")
             return None
 
     def cleanup_old_cache(self, days_old: int = 7):
         """Clean up old cache entries to prevent database bloat"""
-        cutoff_date = datetime.now() - timedelta(days=days_old)
+        cutoff_date = _to_db_timestamp(datetime.now() - timedelta(days=days_old))
         
         with self.get_connection() as conn:
+            conn.execute("BEGIN")
+            
             # Clean old coverage grid cache
             cursor = conn.cursor()
             cursor.execute("""
@@ -448,11 +1069,27 @@ class DatabaseManager:
             heatmap_deleted = cursor.rowcount
             conn.commit()
             
+            # Return freed pages to the OS and refresh planner statistics for the
+            # tables that just churned. executescript steps incremental_vacuum to
+            # completion; execute() would free a single page.
+            conn.executescript("""
+                PRAGMA incremental_vacuum;
+                ANALYZE coverage_grid_cache;
+                ANALYZE heatmap_cache;
+                PRAGMA optimize;
+            """)
+            
             logger.info(f"Cleaned up {coverage_deleted} coverage cache entries and {heatmap_deleted} heatmap cache entries")
+        
+        # Deleted rows may still be held in process; start the caches over
+        with self._cache_lock:
+            self._memory_cache.clear()
+            self._memory_cache_bytes = 0
+            self._miss_cache.clear()
 
     def get_metadata(self, key: str) -> Optional[str]:
         """Get metadata value"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT value FROM metadata WHERE key = ?", (key,))
             result = cursor.fetchone()
@@ -469,13 +1106,19 @@ class DatabaseManager:
 
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics for monitoring"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             
             stats = {}
             
-            # Count records in each table
-            for table in ['orders', 'vendors', 'coverage_grid_cache', 'heatmap_cache']:
+            # Large tables keep trigger-maintained counts; scanning them is too slow to poll
+            cursor.execute("SELECT name, n FROM table_counts")
+            for table, count in cursor.fetchall():
+                stats[f'{table}_count'] = count
+            
+            # Cache tables stay small after cleanup, and INSERT OR REPLACE
+            # doesn't fire delete triggers, so count them directly
+            for table in CACHE_TABLES:
                 cursor.execute(f"SELECT COUNT(*) FROM {table}")
                 stats[f'{table}_count'] = cursor.fetchone()[0]
             
@@ -501,5 +1144,13 @@ def generate_cache_key(city_name: str, business_lines: List[str],
         'additional': additional_params or {}
     }
     
-    key_string = json.dumps(key_data, sort_keys=True)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    # Keys only deduplicate cache entries, so a fast non-cryptographic hash is enough
+    if orjson is not None:
+        key_bytes = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                                 | orjson.OPT_NON_STR_KEYS)
+    else:
+        key_bytes = json.dumps(key_data, sort_keys=True).encode()
+    
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(key_bytes)
+    return hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
@@ -24,14 +24,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import our optimized app
+import app_optimized
 from app_optimized import create_app
 from config import get_config
 
+WAITRESS_THREADS = 16
+GUNICORN_THREADS = 8  # Per worker process
+
 def get_worker_count():
     """Calculate optimal worker count based on CPU cores"""
-    cpu_count = multiprocessing.cpu_count()
-    # Use (2 * CPU cores + 1) as recommended by gunicorn, but cap at 12 for memory efficiency
-    return min(12, (cpu_count * 2) + 1)
+    # One process per core; concurrency within a worker comes from its threads,
+    # so extra processes would only duplicate the app's data in memory. Capped at
+    # 12 since each worker holds its own geodata, read pool and caches
+    return min(12, multiprocessing.cpu_count())
 
 def setup_signal_handlers():
     """Setup signal handlers for graceful shutdown"""
@@ -100,7 +105,7 @@ def run_with_waitress():
         from waitress import serve
         
         config = get_config()
-        app = create_app()
+        app = create_app(db_pool_size=WAITRESS_THREADS)
         
         logger.info("Starting Waitress server (Windows/Cross-platform)...")
         logger.info(f"Server will be available at http://0.0.0.0:{config.FLASK_PORT}")
@@ -110,7 +115,7 @@ def run_with_waitress():
             app, 
             host='0.0.0.0', 
             port=config.FLASK_PORT,
-            threads=8,
+            threads=WAITRESS_THREADS,
             connection_limit=200,
             cleanup_interval=30,
             channel_timeout=120
@@ -144,21 +149,28 @@ def run_with_gunicorn():
                 return self.application
         
         config = get_config()
-        app = create_app()
+        app = create_app(db_pool_size=GUNICORN_THREADS)
         
         worker_count = get_worker_count()
         
         options = {
             'bind': f'0.0.0.0:{config.FLASK_PORT}',
             'workers': worker_count,
-            'worker_class': 'sync',
-            'worker_connections': 100,
+            # Threads rather than gevent: sqlite3 and pandas calls block the whole
+            # process and would stall every greenlet in the worker
+            'worker_class': 'gthread',
+            'worker_connections': 1000,
             'timeout': 120,
             'keepalive': 2,
-            'threads': 2,
+            'threads': GUNICORN_THREADS,
             'max_requests': 1000,
             'max_requests_jitter': 100,
             'preload_app': True,
+            # The app (and its SQLite connections) is created before forking;
+            # give every worker its own handles
+            'post_fork': lambda server, worker: app_optimized.db_manager.reinit_pool(),
+            # Persist queued cache writes before a worker is recycled or stopped
+            'worker_exit': lambda server, worker: app_optimized.db_manager.flush_cache_writes(),
             'accesslog': '-',
             'errorlog': '-',
             'loglevel': 'info',
@@ -166,7 +178,7 @@ def run_with_gunicorn():
         }
         
         logger.info(f"Starting Gunicorn server (Linux/Unix)...")
-        logger.info(f"Workers: {worker_count}")
+        logger.info(f"Workers: {worker_count} x {options['threads']} threads")
         logger.info(f"Server will be available at http://0.0.0.0:{config.FLASK_PORT}")
         logger.info("Press Ctrl+C to stop the server")
         
@@ -322,22 +322,20 @@ class DataScheduler:
     def _invalidate_vendor_related_caches(self):
         """Invalidate caches that depend on vendor data"""
         try:
-            with self.db_manager.get_connection() as conn:
-                # Clear coverage grid cache as it depends on vendor locations
-                conn.execute("DELETE FROM coverage_grid_cache")
-                conn.commit()
-                logger.info("Invalidated vendor-related caches")
+            # Clear coverage grid cache as it depends on vendor locations
+            # (also drops writes still queued for the background cache writer)
+            self.db_manager.clear_cache_table("coverage_grid_cache")
+            logger.info("Invalidated vendor-related caches")
         except Exception as e:
             logger.error(f"Failed to invalidate vendor-related caches: {e}")
             
     def _invalidate_order_related_caches(self):
         """Invalidate caches that depend on order data"""
         try:
-            with self.db_manager.get_connection() as conn:
-                # Clear heatmap cache as it depends on order data
-                conn.execute("DELETE FROM heatmap_cache")
-                conn.commit()
-                logger.info("Invalidated order-related caches")
+            # Clear heatmap cache as it depends on order data
+            # (also drops writes still queued for the background cache writer)
+            self.db_manager.clear_cache_table("heatmap_cache")
+            logger.info("Invalidated order-related caches")
         except Exception as e:
             logger.error(f"Failed to invalidate order-related caches: {e}")
             